@@ -0,0 +1,83 @@
+package com.mritsoftware.mritserver.server
+
+import android.util.Log
+import org.json.JSONObject
+import java.io.BufferedReader
+import java.io.InputStreamReader
+import java.io.OutputStreamWriter
+import java.net.HttpURLConnection
+import java.net.URL
+
+/**
+ * Cliente dos jobs de sync do servidor Python.
+ *
+ * POST /tuya/sync só cria o job (ou reaproveita um igual em andamento) e
+ * devolve o job_id; o progresso é consultado em GET /tuya/sync/<job_id>
+ * até o job terminar. Deve ser chamado fora da thread principal.
+ */
+object SyncJobClient {
+
+    private const val TAG = "SyncJobClient"
+    private const val BASE_URL = "http://127.0.0.1:8000/tuya/sync"
+    private const val POLL_INTERVAL_MS = 1000L
+
+    /**
+     * Dispara o sync e espera terminar.
+     * Retorna o resultado do sync ("ok", "updated", "created", ...) ou null em caso de erro/timeout.
+     */
+    fun runSync(body: String, timeoutMs: Long = 120000): JSONObject? {
+        val started = System.currentTimeMillis()
+        val created = request("POST", BASE_URL, body) ?: return null
+        val jobId = created.optString("job_id", "")
+        if (jobId.isEmpty()) {
+            Log.w(TAG, "Resposta sem job_id: $created")
+            return null
+        }
+
+        while (System.currentTimeMillis() - started < timeoutMs) {
+            val job = request("GET", "$BASE_URL/$jobId", null) ?: return null
+            when (job.optString("status")) {
+                "done" -> return job.optJSONObject("result")
+                "error" -> {
+                    Log.w(TAG, "Job de sync $jobId falhou: ${job.optString("error")}")
+                    return null
+                }
+            }
+            Thread.sleep(POLL_INTERVAL_MS)
+        }
+
+        Log.w(TAG, "Timeout aguardando job de sync $jobId")
+        return null
+    }
+
+    private fun request(method: String, url: String, body: String?): JSONObject? {
+        val connection = URL(url).openConnection() as HttpURLConnection
+        try {
+            connection.requestMethod = method
+            connection.connectTimeout = 10000
+            connection.readTimeout = 10000
+
+            if (body != null) {
+                connection.setRequestProperty("Content-Type", "application/json")
+                connection.doOutput = true
+                val writer = OutputStreamWriter(connection.outputStream, "UTF-8")
+                writer.write(body)
+                writer.flush()
+                writer.close()
+            }
+
+            val responseCode = connection.responseCode
+            if (responseCode != 200 && responseCode != 202) {
+                Log.w(TAG, "$method $url: código $responseCode")
+                return null
+            }
+
+            val reader = BufferedReader(InputStreamReader(connection.inputStream))
+            val response = reader.readText()
+            reader.close()
+            return JSONObject(response)
+        } finally {
+            connection.disconnect()
+        }
+    }
+}
@@ -5,6 +5,7 @@ import android.content.SharedPreferences
 import com.mritsoftware.mritserver.model.TuyaDevice
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.withContext
+import org.json.JSONArray
 import org.json.JSONObject
 import java.io.BufferedReader
 import java.io.InputStreamReader
@@ -19,8 +20,20 @@ class FlaskService(private val context: Context) {
     
     companion object {
         private const val DEFAULT_SERVER_URL = "http://192.168.1.100:8000"
+        // O servidor espera até COMMAND_QUEUE_TIMEOUT (90s) por comando; margem para a resposta
+        private const val COMMANDS_READ_TIMEOUT_MS = 95000
     }
     
+    /**
+     * Item de um lote de comandos. lanIp null faz o servidor descobrir o IP ("auto").
+     */
+    data class DeviceCommand(
+        val deviceId: String,
+        val localKey: String,
+        val action: String, // "on" ou "off"
+        val lanIp: String? = null
+    )
+    
     /**
      * Obtém a URL do servidor Flask configurada
      */
@@ -114,6 +127,66 @@ class FlaskService(private val context: Context) {
         }
     }
     
+    /**
+     * Envia vários comandos de uma vez (executados em paralelo pelo servidor).
+     * Retorna um mapa deviceId -> sucesso.
+     */
+    suspend fun sendCommands(
+        commands: List<DeviceCommand>
+    ): Map<String, Boolean> = withContext(Dispatchers.IO) {
+        val results = mutableMapOf<String, Boolean>()
+        try {
+            val url = URL("${getServerUrl()}/tuya/commands")
+            val connection = url.openConnection() as HttpURLConnection
+            connection.requestMethod = "POST"
+            connection.setRequestProperty("Content-Type", "application/json")
+            connection.setRequestProperty("Accept", "application/json")
+            connection.doOutput = true
+            connection.connectTimeout = 5000
+            connection.readTimeout = COMMANDS_READ_TIMEOUT_MS
+    
+            val commandsArray = JSONArray()
+            for (command in commands) {
+                commandsArray.put(JSONObject().apply {
+                    put("action", command.action)
+                    put("tuya_device_id", command.deviceId)
+                    put("local_key", command.localKey)
+                    put("lan_ip", command.lanIp ?: "auto")
+                })
+            }
+            val jsonBody = JSONObject().apply {
+                put("commands", commandsArray)
+            }
+    
+            val writer = OutputStreamWriter(connection.outputStream, "UTF-8")
+            writer.write(jsonBody.toString())
+            writer.flush()
+            writer.close()
+    
+            if (connection.responseCode == 200) {
+                val reader = BufferedReader(InputStreamReader(connection.inputStream))
+                val response = JSONObject(reader.readText())
+                reader.close()
+    
+                val resultsArray = response.optJSONArray("results") ?: JSONArray()
+                for (i in 0 until resultsArray.length()) {
+                    val item = resultsArray.getJSONObject(i)
+                    results[item.optString("tuya_device_id")] = item.optBoolean("ok", false)
+                }
+            }
+    
+            connection.disconnect()
+        } catch (e: Exception) {
+            e.printStackTrace()
+        }
+    
+        // Comandos sem resposta do servidor são considerados falhos
+        for (command in commands) {
+            results.putIfAbsent(command.deviceId, false)
+        }
+        results
+    }
+    
     /**
      * Obtém informações do site do servidor
      */
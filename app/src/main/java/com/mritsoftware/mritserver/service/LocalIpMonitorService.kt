@@ -2,6 +2,7 @@ package com.mritsoftware.mritserver.service
 
 import android.content.Context
 import android.util.Log
+import com.mritsoftware.mritserver.server.SyncJobClient
 import kotlinx.coroutines.CoroutineScope
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.Job
@@ -12,9 +13,6 @@ import java.net.NetworkInterface
 import java.net.URL
 import java.net.HttpURLConnection
 import org.json.JSONObject
-import java.io.OutputStreamWriter
-import java.io.BufferedReader
-import java.io.InputStreamReader
 
 class LocalIpMonitorService(private val context: Context) {
     
@@ -139,36 +137,15 @@ class LocalIpMonitorService(private val context: Context) {
                 put("devices", JSONObject()) // Objeto vazio, o servidor fará scan
             }
             
-            // Chamar sync para fazer scan e atualizar IPs
-            val syncUrl = URL("http://127.0.0.1:8000/tuya/sync")
-            val syncConnection = syncUrl.openConnection() as HttpURLConnection
-            syncConnection.requestMethod = "POST"
-            syncConnection.setRequestProperty("Content-Type", "application/json")
-            syncConnection.doOutput = true
-            syncConnection.connectTimeout = 40000  // 40 segundos para dar tempo do scan
-            syncConnection.readTimeout = 40000
-            
-            val writer = OutputStreamWriter(syncConnection.outputStream, "UTF-8")
-            writer.write(syncBody.toString())
-            writer.flush()
-            writer.close()
-            
-            val syncCode = syncConnection.responseCode
-            if (syncCode == 200) {
-                val reader = BufferedReader(InputStreamReader(syncConnection.inputStream))
-                val response = reader.readText()
-                reader.close()
-                
-                val json = JSONObject(response)
-                if (json.getBoolean("ok")) {
-                    val updated = json.optInt("updated", 0)
-                    val created = json.optInt("created", 0)
-                    Log.d(TAG, "Dispositivos atualizados no banco: $updated atualizados, $created criados")
-                }
+            // Chamar sync para fazer scan e atualizar IPs (roda como job no servidor)
+            val json = SyncJobClient.runSync(syncBody.toString())
+            if (json != null && json.optBoolean("ok", false)) {
+                val updated = json.optInt("updated", 0)
+                val created = json.optInt("created", 0)
+                Log.d(TAG, "Dispositivos atualizados no banco: $updated atualizados, $created criados")
             } else {
-                Log.w(TAG, "Erro ao sincronizar dispositivos: código $syncCode")
+                Log.w(TAG, "Erro ao sincronizar dispositivos")
             }
-            syncConnection.disconnect()
         } catch (e: Exception) {
             Log.e(TAG, "Erro ao atualizar dispositivos no banco", e)
         }
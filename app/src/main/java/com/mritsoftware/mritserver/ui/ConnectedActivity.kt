@@ -14,6 +14,7 @@ import androidx.core.view.WindowInsetsCompat
 import com.mritsoftware.mritserver.R
 import com.mritsoftware.mritserver.adapter.WelcomeDevice
 import com.mritsoftware.mritserver.adapter.WelcomeDeviceAdapter
+import com.mritsoftware.mritserver.server.SyncJobClient
 import com.mritsoftware.mritserver.service.PythonServerService
 import kotlinx.coroutines.CoroutineScope
 import kotlinx.coroutines.Dispatchers
@@ -367,33 +368,9 @@ class ConnectedActivity : AppCompatActivity() {
     
     private suspend fun syncWithServer(body: String): Boolean = withContext(Dispatchers.IO) {
         try {
-            val url = URL("http://127.0.0.1:8000/tuya/sync")
-            val connection = url.openConnection() as HttpURLConnection
-            connection.requestMethod = "POST"
-            connection.setRequestProperty("Content-Type", "application/json")
-            connection.doOutput = true
-            connection.connectTimeout = 30000
-            connection.readTimeout = 30000
-            
-            val outputStream = connection.outputStream
-            val writer = java.io.OutputStreamWriter(outputStream, "UTF-8")
-            writer.write(body)
-            writer.flush()
-            writer.close()
-            
-            val responseCode = connection.responseCode
-            if (responseCode == 200) {
-                val reader = java.io.BufferedReader(java.io.InputStreamReader(connection.inputStream))
-                val response = reader.readText()
-                reader.close()
-                
-                val json = org.json.JSONObject(response)
-                connection.disconnect()
-                return@withContext json.getBoolean("ok")
-            }
-            
-            connection.disconnect()
-            false
+            // O sync roda como job no servidor; aguarda o job terminar
+            val result = SyncJobClient.runSync(body)
+            result?.optBoolean("ok", false) ?: false
         } catch (e: Exception) {
             android.util.Log.e("ConnectedActivity", "Erro ao sincronizar", e)
             false
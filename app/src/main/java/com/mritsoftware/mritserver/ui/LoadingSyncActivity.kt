@@ -6,6 +6,7 @@ import android.util.Log
 import android.widget.TextView
 import androidx.appcompat.app.AppCompatActivity
 import com.mritsoftware.mritserver.R
+import com.mritsoftware.mritserver.server.SyncJobClient
 import kotlinx.coroutines.CoroutineScope
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.launch
@@ -13,7 +14,6 @@ import kotlinx.coroutines.withContext
 import org.json.JSONObject
 import java.io.BufferedReader
 import java.io.InputStreamReader
-import java.io.OutputStreamWriter
 import java.net.HttpURLConnection
 import java.net.URL
 
@@ -154,33 +154,9 @@ class LoadingSyncActivity : AppCompatActivity() {
     
     private suspend fun syncWithServer(body: String): Boolean = withContext(Dispatchers.IO) {
         try {
-            val url = URL("http://127.0.0.1:8000/tuya/sync")
-            val connection = url.openConnection() as HttpURLConnection
-            connection.requestMethod = "POST"
-            connection.setRequestProperty("Content-Type", "application/json")
-            connection.doOutput = true
-            connection.connectTimeout = 30000
-            connection.readTimeout = 30000
-            
-            val outputStream = connection.outputStream
-            val writer = OutputStreamWriter(outputStream, "UTF-8")
-            writer.write(body)
-            writer.flush()
-            writer.close()
-            
-            val responseCode = connection.responseCode
-            if (responseCode == 200) {
-                val reader = BufferedReader(InputStreamReader(connection.inputStream))
-                val response = reader.readText()
-                reader.close()
-                
-                val json = JSONObject(response)
-                connection.disconnect()
-                return@withContext json.getBoolean("ok")
-            }
-            
-            connection.disconnect()
-            false
+            // O sync roda como job no servidor; aguarda o job terminar
+            val result = SyncJobClient.runSync(body)
+            result?.optBoolean("ok", false) ?: false
         } catch (e: Exception) {
             Log.e("LoadingSync", "Erro ao sincronizar", e)
             false
@@ -15,6 +15,7 @@ import com.google.android.material.button.MaterialButton
 import com.mritsoftware.mritserver.R
 import com.mritsoftware.mritserver.adapter.WelcomeDevice
 import com.mritsoftware.mritserver.adapter.WelcomeDeviceAdapter
+import com.mritsoftware.mritserver.server.SyncJobClient
 import com.mritsoftware.mritserver.service.PythonServerService
 import kotlinx.coroutines.CoroutineScope
 import kotlinx.coroutines.Dispatchers
@@ -25,7 +26,6 @@ import kotlinx.coroutines.withContext
 import org.json.JSONObject
 import java.io.BufferedReader
 import java.io.InputStreamReader
-import java.io.OutputStreamWriter
 import java.net.HttpURLConnection
 import java.net.URL
 
@@ -449,33 +449,9 @@ class WelcomeActivity : AppCompatActivity() {
     
     private suspend fun syncWithServer(body: String): Boolean = withContext(Dispatchers.IO) {
         try {
-            val url = URL("http://127.0.0.1:8000/tuya/sync")
-            val connection = url.openConnection() as HttpURLConnection
-            connection.requestMethod = "POST"
-            connection.setRequestProperty("Content-Type", "application/json")
-            connection.doOutput = true
-            connection.connectTimeout = 30000
-            connection.readTimeout = 30000
-            
-            val outputStream = connection.outputStream
-            val writer = OutputStreamWriter(outputStream, "UTF-8")
-            writer.write(body)
-            writer.flush()
-            writer.close()
-            
-            val responseCode = connection.responseCode
-            if (responseCode == 200) {
-                val reader = BufferedReader(InputStreamReader(connection.inputStream))
-                val response = reader.readText()
-                reader.close()
-                
-                val json = JSONObject(response)
-                connection.disconnect()
-                return@withContext json.getBoolean("ok")
-            }
-            
-            connection.disconnect()
-            false
+            // O sync roda como job no servidor; aguarda o job terminar
+            val result = SyncJobClient.runSync(body)
+            result?.optBoolean("ok", false) ?: false
         } catch (e: Exception) {
             Log.e("WelcomeActivity", "Erro ao sincronizar", e)
             false
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark do caminho de comandos do servidor Tuya contra devices simulados.
+
+Sobe N devices simulados (benchmarks/tuya_simulator.py: TCP 3.3/3.4 e
+anúncios UDP) e o servidor (tuya_server.py) em processos separados, e mede:
+
+  1. discovery: tempo até o cache de discovery conhecer todos os devices só
+     pelos anúncios UDP ouvidos pelo listener passivo;
+  2. /tuya/command com lan_ip explícito (pool de conexões, 3.3 e 3.4);
+  3. /tuya/command com lan_ip "auto" (IP vindo do cache de discovery);
+  4. /tuya/devices (scan falso que devolve os devices simulados).
+
+Para cada etapa reporta vazão (req/s), erros e latência p50/p95/p99.
+O deviceScan() do tinytuya é substituído por um scan falso de --scan-seconds,
+e o módulo do servidor é copiado para um diretório temporário.
+
+Uso:
+    python benchmarks/command_benchmark.py --devices 20 --clients 8 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from load_benchmark import percentile
+from startup_benchmark import SERVER_SOURCE, free_port, wait_for_health
+
+SIMULATOR_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tuya_simulator.py")
+
+# Executado no processo filho: scan falso (vazio até o benchmark informar os
+# devices em /_bench/scan, para que o discovery medido seja só o UDP), rota
+# auxiliar para inspecionar o cache de discovery e o servidor em si
+CHILD_BOOTSTRAP = r"""
+import sys, time
+import tinytuya
+from flask import request
+scan_seconds = float(sys.argv[3])
+scan_devices = []
+def _fake_device_scan(*args, **kwargs):
+    time.sleep(scan_seconds)
+    return {d["ip"]: {"ip": d["ip"], "gwId": d["id"], "version": str(d["version"])} for d in scan_devices}
+tinytuya.deviceScan = _fake_device_scan
+import tuya_server
+@tuya_server.app.route("/_bench/cache")
+def _bench_cache():
+    with tuya_server.DEVICE_CACHE_LOCK:
+        return {"ids": list(tuya_server.DEVICE_CACHE)}
+@tuya_server.app.route("/_bench/scan", methods=["POST"])
+def _bench_scan():
+    scan_devices[:] = request.get_json()
+    return {"ok": True}
+tuya_server.start_server("127.0.0.1", int(sys.argv[1]), mode=sys.argv[2])
+"""
+
+
+def request_json(conn: http.client.HTTPConnection, method: str, path: str, body=None):
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    resp = conn.getresponse()
+    data = resp.read()
+    return resp.status, json.loads(data) if data else {}
+
+
+def run_phase(port: int, duration: float, clients: int, make_request) -> dict:
+    """Roda `clients` threads por `duration` segundos; make_request(i) -> (method, path, body)."""
+    latencies, errors, coalesced = [], [], [0]
+    stop_at = time.time() + duration
+    counter = iter(range(10 ** 9))
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        while time.time() < stop_at:
+            with lock:
+                i = next(counter)
+            method, path, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                status, data = request_json(conn, method, path, body)
+                if status == 200 and data.get("ok"):
+                    latencies.append(time.perf_counter() - started)
+                    if data.get("coalesced"):
+                        coalesced[0] += 1
+                else:
+                    errors.append(data.get("error") or status)
+            except Exception as e:
+                errors.append(type(e).__name__)
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.close()
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    started = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"elapsed": time.time() - started, "latencies": latencies, "errors": errors, "coalesced": coalesced[0]}
+
+
+def report(name: str, result: dict) -> None:
+    lat = result["latencies"]
+    line = (f"{name:<26} ok={len(lat):6d}  erros={len(result['errors']):4d}  "
+            f"{len(lat) / result['elapsed']:8.1f} req/s  "
+            f"p50={percentile(lat, 50) * 1000:7.1f} ms  "
+            f"p95={percentile(lat, 95) * 1000:7.1f} ms  "
+            f"p99={percentile(lat, 99) * 1000:7.1f} ms")
+    if result["coalesced"]:
+        line += f"  agrupados={result['coalesced']}"
+    print(line)
+    if result["errors"]:
+        print(f"{'':<26} primeiro erro: {result['errors'][0]}")
+
+
+def wait_for_discovery(port: int, ids: set, timeout: float) -> float:
+    """Tempo (s) até o cache de discovery do servidor conter todos os ids."""
+    started = time.time()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    while time.time() - started < timeout:
+        _, data = request_json(conn, "GET", "/_bench/cache")
+        if ids <= set(data.get("ids", [])):
+            conn.close()
+            return time.time() - started
+        time.sleep(0.05)
+    conn.close()
+    raise TimeoutError(f"discovery incompleto após {timeout}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=20, help="quantidade de devices simulados")
+    parser.add_argument("--versions", default="3.3,3.4", help="versões do protocolo dos devices")
+    parser.add_argument("--latency", type=float, default=0.0, help="tempo (s) que cada device leva para aplicar um comando")
+    parser.add_argument("--clients", type=int, default=8, help="clientes HTTP concorrentes")
+    parser.add_argument("--duration", type=float, default=10.0, help="duração (s) de cada etapa de carga")
+    parser.add_argument("--interval", type=float, default=1.0, help="intervalo (s) entre anúncios UDP dos devices")
+    parser.add_argument("--scan-seconds", type=float, default=0.5, help="duração do deviceScan() falso")
+    parser.add_argument("--mode", default="waitress", help="modo do servidor (waitress ou flask)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="tuya_cmd_bench_")
+    server = simulator = None
+    try:
+        shutil.copy(SERVER_SOURCE, workdir)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-c", CHILD_BOOTSTRAP, str(port), args.mode, str(args.scan_seconds)],
+            cwd=workdir,
+            env=dict(os.environ, PYTHONPATH=workdir),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        wait_for_health(port, 30)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        request_json(conn, "POST", "/config/log", {"level": "WARN"})
+
+        # Anúncios UDP só depois que o listener do servidor estiver no ar
+        simulator = subprocess.Popen(
+            [sys.executable, SIMULATOR_SOURCE, "--devices", str(args.devices), "--versions", args.versions,
+             "--latency", str(args.latency), "--broadcast-to", "127.0.0.1", "--interval", str(args.interval)],
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        first_line = simulator.stdout.readline()
+        if not first_line.startswith("DEVICES "):
+            print("Simulador não iniciou (a faixa 127.0.0.0/8 precisa responder no loopback)")
+            return 1
+        devices = json.loads(first_line[len("DEVICES "):])
+
+        print(f"{args.devices} device(s) simulados ({args.versions}), {args.clients} cliente(s), "
+              f"{args.duration:.0f}s por etapa, servidor {args.mode}")
+        print()
+
+        discovery_s = wait_for_discovery(port, {d["id"] for d in devices}, 60)
+        print(f"{'discovery (cache completo)':<26} {discovery_s * 1000:.1f} ms")
+        # A partir daqui o scan falso também devolve os devices simulados
+        request_json(conn, "POST", "/_bench/scan", devices)
+        conn.close()
+
+        def command(lan_ip_auto: bool):
+            def make(i):
+                d = devices[i % len(devices)]
+                return "POST", "/tuya/command", {
+                    "action": "on" if (i // len(devices)) % 2 == 0 else "off",
+                    "tuya_device_id": d["id"],
+                    "local_key": d["local_key"],
+                    "lan_ip": "auto" if lan_ip_auto else d["ip"],
+                    "version": d["version"]
+                }
+            return make
+
+        report("/tuya/command (lan_ip)", run_phase(port, args.duration, args.clients, command(False)))
+        report("/tuya/command (auto)", run_phase(port, args.duration, args.clients, command(True)))
+        report("/tuya/devices", run_phase(port, args.duration, args.clients, lambda i: ("GET", "/tuya/devices", None)))
+    finally:
+        for proc in (server, simulator):
+            if proc is not None and proc.poll() is None:
+                proc.terminate()
+                proc.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga do servidor Tuya (tuya_server.py): waitress x Flask.
+
+Para cada modo de servidor (start_server(mode=...)), sobe o módulo em um
+processo novo e dispara clientes concorrentes com conexões keep-alive:
+  - --clients clientes martelando GET /health (requisição rápida)
+  - --slow-clients clientes chamando GET /tuya/devices, que ficam presos no
+    deviceScan() falso de --scan-seconds (simula o scan real de rede)
+
+Reporta vazão (req/s), erros e latência p50/p95/p99 de cada endpoint, para
+mostrar como cada modo se comporta com requisições lentas ocupando workers.
+
+Uso:
+    python benchmarks/load_benchmark.py --duration 10 --clients 32
+    python benchmarks/load_benchmark.py --modes waitress --threads 16
+"""
+
+import argparse
+import http.client
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from startup_benchmark import SERVER_SOURCE, free_port, wait_for_health
+
+# Executado no processo filho: aplica o scan falso e sobe o servidor no modo pedido
+CHILD_BOOTSTRAP = r"""
+import sys, time
+import tinytuya
+scan_seconds = float(sys.argv[3])
+def _fake_device_scan(*args, **kwargs):
+    time.sleep(scan_seconds)
+    return {}
+tinytuya.deviceScan = _fake_device_scan
+import tuya_server
+# Evita que o scan reaproveitado esconda o custo das requisições lentas
+tuya_server.SCAN_REUSE_WINDOW = 0
+tuya_server.start_server("127.0.0.1", int(sys.argv[1]), mode=sys.argv[2], threads=int(sys.argv[4]))
+"""
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def client_loop(port: int, path: str, stop_at: float, latencies: list, errors: list, timeout: float):
+    """Faz requisições em sequência numa conexão keep-alive até stop_at."""
+    conn = None
+    while time.time() < stop_at:
+        if conn is None:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+            else:
+                latencies.append(time.perf_counter() - started)
+            if resp.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = None
+        except Exception as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def run_mode(workdir: str, mode: str, args) -> dict:
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", CHILD_BOOTSTRAP, str(port), mode, str(args.scan_seconds), str(args.threads)],
+        cwd=workdir,
+        env=dict(os.environ, PYTHONPATH=workdir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    results = {}
+    try:
+        wait_for_health(port, 30)
+        stop_at = time.time() + args.duration
+        plan = [("/health", args.clients), ("/tuya/devices", args.slow_clients)]
+        threads = []
+        for path, count in plan:
+            results[path] = {"latencies": [], "errors": []}
+            for _ in range(count):
+                t = threading.Thread(
+                    target=client_loop,
+                    args=(port, path, stop_at, results[path]["latencies"], results[path]["errors"], args.timeout),
+                    daemon=True
+                )
+                threads.append(t)
+        started = time.time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(args.duration + args.timeout + 5)
+        results["elapsed"] = time.time() - started
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return results
+
+
+def report(mode: str, results: dict):
+    elapsed = results.pop("elapsed")
+    print(f"modo {mode} ({elapsed:.1f}s)")
+    for path, data in results.items():
+        lat = data["latencies"]
+        print(f"  {path:<14} ok={len(lat):6d}  erros={len(data['errors']):4d}  "
+              f"{len(lat) / elapsed:8.1f} req/s  "
+              f"p50={percentile(lat, 50) * 1000:7.1f} ms  "
+              f"p95={percentile(lat, 95) * 1000:7.1f} ms  "
+              f"p99={percentile(lat, 99) * 1000:7.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="waitress,flask", help="modos a comparar, separados por vírgula")
+    parser.add_argument("--duration", type=float, default=10.0, help="duração da carga em segundos, por modo")
+    parser.add_argument("--clients", type=int, default=32, help="clientes concorrentes em /health")
+    parser.add_argument("--slow-clients", type=int, default=2, help="clientes concorrentes em /tuya/devices")
+    parser.add_argument("--scan-seconds", type=float, default=2.0, help="duração do deviceScan() falso")
+    parser.add_argument("--threads", type=int, default=8, help="threads do waitress")
+    parser.add_argument("--timeout", type=float, default=30.0, help="timeout de cada requisição")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="tuya_load_")
+    try:
+        shutil.copy(SERVER_SOURCE, workdir)
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            report(mode, run_mode(workdir, mode, args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Verificação do tratamento de local_key rejeitada pelo device.
+
+Sobe devices simulados (benchmarks/tuya_simulator.py) e importa o servidor
+(tuya_server.py) a partir de uma cópia num diretório temporário, e confere:
+
+  1. comando com a key errada num device 3.4 (resposta 914): a key vai para
+     INVALID_LOCAL_KEYS e sai do LOCAL_KEY_CACHE;
+  2. comando com a key certa depois disso: ela passa a ser a key conhecida;
+  3. leitura de status do poller com a key errada: a key é marcada e o
+     próximo ciclo não volta a usá-la;
+  4. índice da coleta em massa com a key antiga: depois que o device a rejeita,
+     a busca na nuvem traz a key atual pela consulta individual (sem refazer a
+     listagem dentro do LOCAL_KEY_HARVEST_TTL) e o índice passa a servi-la.
+
+A API Tuya é substituída por uma falsa que lista o device com a key antiga
+e devolve a key atual na consulta individual.
+
+Uso:
+    python benchmarks/local_key_check.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+from startup_benchmark import SERVER_SOURCE
+from tuya_simulator import SimulatedNetwork
+
+WRONG_KEY = "x" * 16
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'OK  ' if ok else 'FALHA'} {name}")
+    return ok
+
+
+def fake_tuya_api(dev_id: str, local_key: str, calls: list):
+    """tuya_api_get falso: listagem com a key antiga, consulta individual com a atual."""
+    def tuya_api_get(account, path, params=None):
+        calls.append(path)
+        if path == "/v1.3/iot-03/devices":
+            return {"success": True, "result": {"list": [{"id": dev_id, "local_key": WRONG_KEY}], "has_more": False}}
+        if path == f"/v2.0/cloud/thing/{dev_id}":
+            return {"success": True, "result": {"local_key": local_key}}
+        return {"success": False, "code": 1106}
+    return tuya_api_get
+
+
+def main() -> int:
+    workdir = tempfile.mkdtemp(prefix="tuya_key_check_")
+    network = SimulatedNetwork(1, versions=(3.4,))
+    try:
+        shutil.copy(SERVER_SOURCE, workdir)
+        os.chdir(workdir)
+        sys.path.insert(0, workdir)
+        import tuya_server as ts
+        ts.set_log_level("WARN")
+        # Falha rápido: a key errada derruba a negociação de sessão em toda tentativa
+        ts.POOL_SOCKET_TIMEOUT = 1
+        ts.POOL_SOCKET_RETRY_LIMIT = 1
+
+        network.start()
+        device = network.devices[0]
+        dev_id, local_key = device.dev_id, device.local_key.decode()
+        results = []
+
+        ts.remember_local_key(dev_id, WRONG_KEY)
+        try:
+            ts.send_tuya_command("on", dev_id, WRONG_KEY, device.ip, device.version)
+        except RuntimeError:
+            pass
+        results.append(check("key rejeitada (914) marcada como inválida",
+                             ts.INVALID_LOCAL_KEYS.get(dev_id) == WRONG_KEY))
+        results.append(check("key rejeitada sai do cache de local_keys",
+                             ts.get_known_local_key(dev_id) is None))
+
+        ts.send_tuya_command("on", dev_id, local_key, device.ip, device.version)
+        results.append(check("key aceita volta a ser a key conhecida",
+                             ts.get_known_local_key(dev_id) == local_key))
+
+        ts.drop_pooled_connection(dev_id)
+        ts.remember_local_key(dev_id, WRONG_KEY)
+        ts.update_device_cache(dev_id, device.ip, device.version)
+        ts._poll_device_status(dev_id)
+        results.append(check("poll com key rejeitada marca a key como inválida",
+                             ts.INVALID_LOCAL_KEYS.get(dev_id) == WRONG_KEY))
+        results.append(check("próximo poll não reaproveita a key rejeitada",
+                             ts._status_poll_target(dev_id) is None))
+
+        calls = []
+        ts.load_tuya_connector = lambda: True
+        ts.tuya_api_get = fake_tuya_api(dev_id, local_key, calls)
+        ts.TUYA_ACCOUNTS = [{"access_id": "bench0000", "access_key": "x", "endpoint": "x", "uid": "bench"}]
+        ts.INVALID_LOCAL_KEYS.clear()
+        ts.LOCAL_KEY_CACHE.clear()
+        results.append(check("índice serve a key da listagem",
+                             ts.fetch_local_key_from_tuya_api(dev_id) == WRONG_KEY))
+        ts.drop_pooled_connection(dev_id)
+        try:
+            ts.send_tuya_command("on", dev_id, WRONG_KEY, device.ip, device.version)
+        except RuntimeError:
+            pass
+        del calls[:]
+        results.append(check("key do índice rejeitada é trocada pela da consulta individual",
+                             ts.fetch_local_key_from_tuya_api(dev_id) == local_key
+                             and calls == [f"/v2.0/cloud/thing/{dev_id}"]))
+        del calls[:]
+        results.append(check("índice passa a servir a key atual",
+                             ts.fetch_local_key_from_tuya_api(dev_id) == local_key and not calls))
+
+        return 0 if all(results) else 1
+    finally:
+        network.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
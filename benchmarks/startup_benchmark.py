@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização do servidor Tuya (tuya_server.py).
+
+Mede, em um processo novo a cada rodada:
+  - tempo de import do módulo tuya_server
+  - tempo até o /health responder 200 depois de chamar start_server()
+
+O deviceScan() do tinytuya é substituído por um scan falso que demora
+--scan-seconds (padrão 30, o timeout real), para mostrar que o scan inicial
+não bloqueia mais o servidor. Use --real-scan para usar o scan de verdade.
+
+O módulo é copiado para um diretório temporário, então config.json e demais
+arquivos de estado não são gravados dentro do projeto.
+
+Uso:
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+SERVER_SOURCE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "app", "src", "main", "python", "tuya_server.py"
+)
+
+# Executado no processo filho: aplica o scan falso, importa o módulo e sobe o servidor
+CHILD_BOOTSTRAP = r"""
+import json, sys, time
+t0 = time.time()
+scan_seconds = float(sys.argv[2])
+if scan_seconds >= 0:
+    import tinytuya
+    def _fake_device_scan(*args, **kwargs):
+        time.sleep(scan_seconds)
+        return {}
+    tinytuya.deviceScan = _fake_device_scan
+t_import = time.time()
+import tuya_server
+import_done = time.time()
+print("BENCH " + json.dumps({"import_s": import_done - t_import, "boot_s": import_done - t0}), flush=True)
+tuya_server.start_server("127.0.0.1", int(sys.argv[1]))
+"""
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_health(port: int, timeout: float) -> float:
+    """Retorna o instante em que o /health respondeu 200 (ou levanta TimeoutError)."""
+    deadline = time.time() + timeout
+    url = f"http://127.0.0.1:{port}/health"
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return time.time()
+        except Exception:
+            time.sleep(0.02)
+    raise TimeoutError(f"/health não respondeu em {timeout}s")
+
+
+def run_once(workdir: str, scan_seconds: float, timeout: float) -> dict:
+    port = free_port()
+    started = time.time()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", CHILD_BOOTSTRAP, str(port), str(scan_seconds)],
+        cwd=workdir,
+        env=dict(os.environ, PYTHONPATH=workdir),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    try:
+        health_at = wait_for_health(port, timeout)
+        result = {"health_s": health_at - started}
+    finally:
+        proc.terminate()
+        output, _ = proc.communicate(timeout=10)
+
+    for line in output.splitlines():
+        if line.startswith("BENCH "):
+            result.update(json.loads(line[len("BENCH "):]))
+    return result
+
+
+def summarize(name: str, values: list) -> str:
+    return (f"{name:<22} min={min(values) * 1000:8.1f} ms  "
+            f"med={statistics.median(values) * 1000:8.1f} ms  max={max(values) * 1000:8.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="número de inicializações medidas")
+    parser.add_argument("--scan-seconds", type=float, default=30.0, help="duração do deviceScan() falso")
+    parser.add_argument("--real-scan", action="store_true", help="usar o deviceScan() real do tinytuya")
+    parser.add_argument("--timeout", type=float, default=60.0, help="tempo máximo esperando o /health")
+    args = parser.parse_args()
+
+    scan_seconds = -1.0 if args.real_scan else args.scan_seconds
+    workdir = tempfile.mkdtemp(prefix="tuya_bench_")
+    try:
+        shutil.copy(SERVER_SOURCE, workdir)
+        results = []
+        for i in range(args.runs):
+            # Apaga o estado para medir também o primeiro boot (sem config.json)
+            for name in os.listdir(workdir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(workdir, name))
+            result = run_once(workdir, scan_seconds, args.timeout)
+            results.append(result)
+            print(f"rodada {i + 1}: import={result.get('import_s', 0) * 1000:.1f} ms  "
+                  f"/health={result['health_s'] * 1000:.1f} ms")
+
+        print()
+        print(f"scan inicial: {'real' if args.real_scan else f'falso de {args.scan_seconds:.0f}s'}")
+        print(summarize("import tuya_server", [r["import_s"] for r in results if "import_s" in r]))
+        print(summarize("spawn → /health 200", [r["health_s"] for r in results]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmark do /tuya/sync contra stand-ins locais do Supabase e da nuvem Tuya.
+
+Sobe, no processo do benchmark, um servidor HTTP que faz o papel de:
+  - PostgREST do Supabase (/rest/v1/tuya_devices, /rest/v1/contas_tuya),
+    com uma tabela em memória;
+  - API da nuvem Tuya (/v1.0/token, /v1.3/iot-03/devices paginado,
+    /v2.0/cloud/thing/{id}), com os devices divididos entre --accounts contas.
+Cada resposta é atrasada por --db-latency / --cloud-latency para simular a WAN.
+
+Para cada quantidade de devices (--sizes, padrão 10,100,1000) o servidor
+(tuya_server.py) é iniciado num processo novo, com um deviceScan() falso que
+"encontra" todos os devices, e o /tuya/sync é chamado duas vezes: a frio
+(caches vazios, sem local_keys no banco) e a quente. Metade dos devices já
+existe no banco com IP desatualizado; a outra metade é nova.
+
+Reporta o tempo total de cada sync, as chamadas HTTP de saída por etapa
+(contadas pelos stand-ins) e o tempo gasto por etapa segundo o /metrics.
+
+Uso:
+    python benchmarks/sync_benchmark.py
+    python benchmarks/sync_benchmark.py --sizes 100 --no-harvest
+"""
+
+import argparse
+import http.client
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from startup_benchmark import SERVER_SOURCE, free_port, wait_for_health
+
+# Executado no processo filho: scan falso com os devices do benchmark e
+# Supabase/contas Tuya apontando para os stand-ins
+CHILD_BOOTSTRAP = r"""
+import json, sys
+import tinytuya
+config = json.load(open(sys.argv[2]))
+def _fake_device_scan(*args, **kwargs):
+    return {d["ip"]: {"ip": d["ip"], "gwId": d["id"], "version": "3.3"} for d in config["devices"]}
+tinytuya.deviceScan = _fake_device_scan
+import tuya_server
+tuya_server.update_supabase_config(config["supabase_url"], "bench-anon-key")
+tuya_server.update_tuya_accounts(config["accounts"])
+tuya_server.LOCAL_KEY_HARVEST_ENABLED = config["harvest"]
+tuya_server.set_log_level("WARN")
+tuya_server.start_server("127.0.0.1", int(sys.argv[1]), mode="waitress")
+"""
+
+
+class StandIn:
+    """Estado compartilhado dos stand-ins: tabela tuya_devices, devices da nuvem e contadores."""
+
+    def __init__(self, devices: list, accounts: list, db_latency: float, cloud_latency: float):
+        self.db_latency = db_latency
+        self.cloud_latency = cloud_latency
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.rows = {}
+        self.accounts = accounts
+        # Cada conta é dona de uma fatia dos devices
+        self.cloud = {a["access_id"]: {} for a in accounts}
+        for i, d in enumerate(devices):
+            self.cloud[accounts[i % len(accounts)]["access_id"]][d["id"]] = d["local_key"]
+        # Metade dos devices já está no banco, com IP antigo e sem local_key
+        for d in devices[: len(devices) // 2]:
+            self.rows[d["id"]] = {
+                "id": len(self.rows) + 1,
+                "tuya_device_id": d["id"],
+                "site_id": "BENCH",
+                "name": "BENCH",
+                "local_key": None,
+                "lan_ip": "10.0.0.1",
+                "protocol_version": "3.3"
+            }
+
+    def count(self, stage: str) -> None:
+        with self.lock:
+            self.calls[stage] += 1
+
+    def snapshot(self) -> Counter:
+        with self.lock:
+            return Counter(self.calls)
+
+
+def make_handler(state: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body=None):
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length)) if length else None
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PATCH(self):
+            self._dispatch("PATCH")
+
+        def _dispatch(self, method: str):
+            url = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path.startswith("/rest/v1/"):
+                time.sleep(state.db_latency)
+                table = url.path[len("/rest/v1/"):]
+                state.count(f"supabase {method} {table}")
+                return self._postgrest(method, table, query)
+            time.sleep(state.cloud_latency)
+            template = re.sub(r"/thing/[^/]+$", "/thing/{id}", url.path)
+            state.count(f"tuya_cloud {method} {template}")
+            return self._cloud(url.path, query)
+
+        def _postgrest(self, method: str, table: str, query: dict):
+            if table == "contas_tuya":
+                return self._reply(200, state.accounts)
+            if table != "tuya_devices":
+                return self._reply(404, {"message": "tabela desconhecida"})
+            body = self._body() if method != "GET" else None
+            with state.lock:
+                if method == "GET":
+                    ids = query.get("tuya_device_id", "in.()")[4:-1].split(",")
+                    return self._reply(200, [dict(state.rows[i]) for i in ids if i in state.rows])
+                if method == "POST":
+                    rows = body if isinstance(body, list) else [body]
+                    written = []
+                    for row in rows:
+                        current = state.rows.setdefault(row["tuya_device_id"], {"id": len(state.rows) + 1})
+                        current.update(row)
+                        written.append(dict(current))
+                    return self._reply(201, None if "return=minimal" in (self.headers.get("Prefer") or "") else written)
+                if method == "PATCH":
+                    device_id = query.get("tuya_device_id", "eq.")[3:]
+                    if device_id not in state.rows:
+                        return self._reply(200, [])
+                    state.rows[device_id].update(body)
+                    return self._reply(200, [dict(state.rows[device_id])])
+            return self._reply(405, {"message": "método não suportado"})
+
+        def _cloud(self, path: str, query: dict):
+            access_id = self.headers.get("client_id", "")
+            owned = state.cloud.get(access_id, {})
+            if path == "/v1.0/token":
+                return self._reply(200, {
+                    "success": True,
+                    "t": int(time.time() * 1000),
+                    "result": {"access_token": f"tok-{access_id}", "refresh_token": "ref", "expire_time": 7200, "uid": "bench"}
+                })
+            if path == "/v1.3/iot-03/devices":
+                ids = sorted(owned)
+                start = int(query.get("last_row_key") or 0)
+                size = int(query.get("page_size") or 20)
+                page = ids[start:start + size]
+                has_more = start + size < len(ids)
+                return self._reply(200, {"success": True, "result": {
+                    "list": [{"id": i, "local_key": owned[i]} for i in page],
+                    "has_more": has_more,
+                    "last_row_key": str(start + size) if has_more else ""
+                }})
+            if path.startswith("/v2.0/cloud/thing/"):
+                device_id = path.rsplit("/", 1)[1]
+                if device_id in owned:
+                    return self._reply(200, {"success": True, "result": {"id": device_id, "local_key": owned[device_id]}})
+                return self._reply(200, {"success": False, "code": 1106, "msg": "permission deny"})
+            return self._reply(404, {"success": False, "code": 404})
+
+    return Handler
+
+
+def stage_seconds(port: int) -> Counter:
+    """Soma do tempo (s) por etapa em mrit_stage_duration_seconds, agrupada pelo prefixo da etapa."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/metrics")
+    text = conn.getresponse().read().decode()
+    conn.close()
+    totals = Counter()
+    for match in re.finditer(r'^mrit_stage_duration_seconds_sum\{stage="([^":]+)[^"]*",[^}]*\} ([0-9.e+-]+)$', text, re.M):
+        totals[match.group(1)] += float(match.group(2))
+    return totals
+
+
+def run_sync(port: int) -> tuple:
+    """Dispara o job de sync e acompanha em /tuya/sync/<job_id> até terminar."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    started = time.perf_counter()
+    conn.request("POST", "/tuya/sync", body="{}", headers={"Content-Type": "application/json"})
+    job_id = json.loads(conn.getresponse().read())["job_id"]
+    while True:
+        conn.request("GET", f"/tuya/sync/{job_id}")
+        job = json.loads(conn.getresponse().read())
+        if job["status"] in ("done", "error"):
+            break
+        time.sleep(0.02)
+    conn.close()
+    return time.perf_counter() - started, job["result"] or {"ok": False, "error": job["error"]}
+
+
+def run_size(size: int, args, workdir: str) -> None:
+    devices = [
+        {"id": f"benchdev{i:012d}", "local_key": f"{i:016d}"[-16:], "ip": f"192.168.{i // 250}.{i % 250 + 2}"}
+        for i in range(size)
+    ]
+    port_standin = free_port()
+    accounts = []
+    for i in range(args.accounts):
+        accounts.append({
+            "access_id": f"benchaccess{i:02d}",
+            "access_key": "secret",
+            "endpoint": f"http://127.0.0.1:{port_standin}",
+            "uid": f"uid{i}",
+            "label": f"bench {i}"
+        })
+    state = StandIn(devices, accounts, args.db_latency, args.cloud_latency)
+    httpd = ThreadingHTTPServer(("127.0.0.1", port_standin), make_handler(state))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    # Estado limpo a cada tamanho (config, cache de discovery, tokens, roteamento)
+    for name in os.listdir(workdir):
+        if name.endswith(".json"):
+            os.remove(os.path.join(workdir, name))
+    config_path = os.path.join(workdir, "bench_config.input")
+    with open(config_path, "w") as f:
+        json.dump({
+            "devices": devices,
+            "accounts": accounts,
+            "supabase_url": f"http://127.0.0.1:{port_standin}",
+            "harvest": not args.no_harvest
+        }, f)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-c", CHILD_BOOTSTRAP, str(port), config_path],
+        cwd=workdir,
+        env=dict(os.environ, PYTHONPATH=workdir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_health(port, 30)
+        # Espera o scan inicial (instantâneo) para que ele não conte no sync
+        time.sleep(0.5)
+        print(f"{size} device(s), {args.accounts} conta(s), coleta em massa "
+              f"{'desligada' if args.no_harvest else 'ligada'}")
+        for label in ("a frio", "a quente"):
+            calls_before = state.snapshot()
+            stages_before = stage_seconds(port)
+            elapsed, data = run_sync(port)
+            calls = state.snapshot() - calls_before
+            stages = stage_seconds(port) - stages_before
+            with state.lock:
+                with_key = sum(1 for r in state.rows.values() if r.get("local_key"))
+            print(f"  {label:<9} {elapsed * 1000:9.1f} ms  ok={data.get('ok')}  "
+                  f"atualizados={data.get('updated', 0)}  criados={data.get('created', 0)}  "
+                  f"com local_key no banco={with_key}/{size}")
+            print(f"    chamadas HTTP: {sum(calls.values())} no total")
+            for stage, count in sorted(calls.items()):
+                print(f"      {stage:<44} {count:6d}")
+            if stages:
+                timing = "  ".join(f"{stage}={seconds * 1000:.0f} ms" for stage, seconds in sorted(stages.items()))
+                print(f"    tempo por etapa (/metrics): {timing}")
+        print()
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="quantidades de devices, separadas por vírgula")
+    parser.add_argument("--accounts", type=int, default=2, help="contas Tuya entre as quais os devices são divididos")
+    parser.add_argument("--db-latency", type=float, default=0.03, help="latência (s) de cada chamada ao Supabase")
+    parser.add_argument("--cloud-latency", type=float, default=0.08, help="latência (s) de cada chamada à nuvem Tuya")
+    parser.add_argument("--no-harvest", action="store_true", help="desliga a coleta em massa de local_keys")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="tuya_sync_bench_")
+    try:
+        shutil.copy(SERVER_SOURCE, workdir)
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            run_size(size, args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Simulador local de devices Tuya (tomadas) para testes e benchmarks.
+
+Cada device simulado:
+  - escuta TCP na porta 6668 de um IP de loopback próprio (127.0.0.10,
+    127.0.0.11, ...), já que o servidor sempre conecta na porta 6668;
+  - fala o protocolo LAN 3.3 (AES-ECB + CRC) ou 3.4 (negociação de chave de
+    sessão + HMAC-SHA256), respondendo a CONTROL/CONTROL_NEW, DP_QUERY,
+    DP_QUERY_NEW e HEART_BEAT como um device real (ACK vazio + STATUS);
+  - anuncia-se por UDP na porta 6667 (pacote 55AA criptografado com a chave
+    de discovery), como os devices reais fazem em broadcast.
+
+Precisa de um sistema em que toda a faixa 127.0.0.0/8 responda no loopback
+(padrão no Linux; no macOS é preciso criar os aliases com ifconfig).
+
+Uso direto (fica rodando até Ctrl+C e imprime os devices em JSON):
+    python benchmarks/tuya_simulator.py --devices 20 --versions 3.3,3.4 --broadcast-to 127.0.0.1
+"""
+
+import argparse
+import hmac
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from hashlib import sha256
+
+import tinytuya
+
+DEVICE_PORT = 6668
+FIRST_HOST = 10  # 127.0.0.10 é o primeiro device
+VERSION_HEADER_PADDING = 12 * b"\x00"
+HEADER_SIZE = struct.calcsize(">4I")
+RETCODE_OK = struct.pack(">I", 0)
+
+
+def _aes(key: bytes):
+    return tinytuya.AESCipher(key)
+
+
+class SimulatedDevice:
+    """Uma tomada Tuya simulada (DPS "1" = liga/desliga)."""
+
+    def __init__(self, dev_id: str, local_key: str, ip: str, version: float, latency: float = 0.0):
+        self.dev_id = dev_id
+        self.local_key = local_key.encode()
+        self.ip = ip
+        self.version = version
+        self.latency = latency
+        self.dps = {"1": False}
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def info(self) -> dict:
+        return {"id": self.dev_id, "local_key": self.local_key.decode(), "ip": self.ip, "version": self.version}
+
+    def announcement(self) -> bytes:
+        """Pacote UDP de anúncio (porta 6667), igual ao que o device real envia em broadcast."""
+        payload = json.dumps({
+            "ip": self.ip,
+            "gwId": self.dev_id,
+            "active": 2,
+            "ability": 0,
+            "mode": 0,
+            "encrypt": True,
+            "productKey": "simulated",
+            "version": str(self.version)
+        }).encode()
+        encrypted = _aes(tinytuya.udpkey).encrypt(payload, use_base64=False, pad=True)
+        msg = tinytuya.TuyaMessage(0, tinytuya.UDP_NEW, 0, RETCODE_OK + encrypted, 0, True, 0x55AA, None)
+        return tinytuya.pack_message(msg)
+
+    def start(self) -> None:
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.ip, DEVICE_PORT))
+        self._server.listen(16)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    # ---- protocolo ----
+
+    def _recv_frame(self, conn: socket.socket, buffer: bytearray):
+        """Lê um frame 55AA completo. Retorna os bytes do frame ou None se a conexão fechou."""
+        while True:
+            if len(buffer) >= HEADER_SIZE:
+                header = tinytuya.parse_header(bytes(buffer[:HEADER_SIZE]))
+                if len(buffer) >= header.total_length:
+                    frame = bytes(buffer[:header.total_length])
+                    del buffer[:header.total_length]
+                    return frame
+            chunk = conn.recv(4096)
+            if not chunk:
+                return None
+            buffer.extend(chunk)
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        session = {"key": None, "local_nonce": None, "remote_nonce": None}
+        buffer = bytearray()
+        seqno = 1
+        try:
+            while True:
+                frame = self._recv_frame(conn, buffer)
+                if frame is None:
+                    return
+                hmac_key = (session["key"] or self.local_key) if self.version >= 3.4 else None
+                msg = tinytuya.unpack_message(frame, hmac_key=hmac_key, no_retcode=True)
+                if not msg.crc_good:
+                    # Chave errada: um device real simplesmente ignora o frame
+                    continue
+                for cmd, payload in self._handle(msg, session):
+                    key = (session["key"] or self.local_key) if self.version >= 3.4 else None
+                    if cmd == tinytuya.SESS_KEY_NEG_RESP:
+                        key = self.local_key
+                    out = tinytuya.TuyaMessage(seqno if cmd == tinytuya.STATUS else msg.seqno, cmd, 0,
+                                               RETCODE_OK + payload, 0, True, 0x55AA, None)
+                    seqno += 1
+                    conn.sendall(tinytuya.pack_message(out, hmac_key=key))
+        except (OSError, ValueError, tinytuya.DecodeError):
+            pass
+        finally:
+            conn.close()
+
+    def _handle(self, msg, session) -> list:
+        """Processa um frame recebido e retorna a lista de (cmd, payload) a responder."""
+        cmd = msg.cmd
+        if cmd == tinytuya.SESS_KEY_NEG_START:
+            session["local_nonce"] = _aes(self.local_key).decrypt(msg.payload, False, decode_text=False)[:16]
+            session["remote_nonce"] = os.urandom(16)
+            proof = hmac.new(self.local_key, session["local_nonce"], sha256).digest()
+            payload = _aes(self.local_key).encrypt(session["remote_nonce"] + proof, False)
+            return [(tinytuya.SESS_KEY_NEG_RESP, payload)]
+
+        if cmd == tinytuya.SESS_KEY_NEG_FINISH:
+            mixed = bytes(a ^ b for a, b in zip(session["local_nonce"], session["remote_nonce"]))
+            session["key"] = _aes(self.local_key).encrypt(mixed, False, pad=False)
+            return []
+
+        if cmd == tinytuya.HEART_BEAT:
+            return [(tinytuya.HEART_BEAT, b"")]
+
+        if cmd in (tinytuya.DP_QUERY, tinytuya.DP_QUERY_NEW):
+            return [(cmd, self._encode(self._status_json(), session, with_header=False))]
+
+        if cmd in (tinytuya.CONTROL, tinytuya.CONTROL_NEW):
+            request = json.loads(self._decode(msg.payload, session))
+            dps = request.get("dps") or (request.get("data") or {}).get("dps") or {}
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                self.dps.update(dps)
+                self.commands += 1
+            # Como o device real: ACK vazio e, em seguida, o STATUS com o novo estado
+            return [(cmd, b""), (tinytuya.STATUS, self._encode(self._status_json(dps), session, with_header=True))]
+
+        return []
+
+    def _status_json(self, dps: dict = None) -> bytes:
+        with self._lock:
+            current = dict(dps if dps is not None else self.dps)
+        if self.version >= 3.4:
+            body = {"protocol": 4, "t": int(time.time()), "data": {"dps": current}}
+        else:
+            body = {"devId": self.dev_id, "dps": current, "t": int(time.time())}
+        return json.dumps(body, separators=(",", ":")).encode()
+
+    def _version_header(self) -> bytes:
+        return str(self.version).encode() + VERSION_HEADER_PADDING
+
+    def _decode(self, payload: bytes, session) -> bytes:
+        if self.version >= 3.4:
+            payload = _aes(session["key"]).decrypt(payload, False, decode_text=False)
+            if payload.startswith(self._version_header()[:3]):
+                payload = payload[len(self._version_header()):]
+            return payload
+        if payload.startswith(self._version_header()[:3]):
+            payload = payload[len(self._version_header()):]
+        return _aes(self.local_key).decrypt(payload, False, decode_text=False)
+
+    def _encode(self, body: bytes, session, with_header: bool) -> bytes:
+        if self.version >= 3.4:
+            raw = (self._version_header() + body) if with_header else body
+            return _aes(session["key"]).encrypt(raw, False)
+        encrypted = _aes(self.local_key).encrypt(body, False)
+        return (self._version_header() + encrypted) if with_header else encrypted
+
+
+class SimulatedNetwork:
+    """Conjunto de devices simulados mais o anunciador UDP."""
+
+    def __init__(self, count: int, versions=(3.3, 3.4), latency: float = 0.0):
+        self.devices = []
+        for i in range(count):
+            version = versions[i % len(versions)]
+            dev_id = f"simdev{i:014d}"
+            local_key = f"{i:016d}"[-16:]
+            self.devices.append(SimulatedDevice(dev_id, local_key, f"127.0.0.{FIRST_HOST + i}", version, latency))
+        self._stop = threading.Event()
+
+    def start(self, broadcast_to: str = None, interval: float = 5.0) -> None:
+        for device in self.devices:
+            device.start()
+        if broadcast_to:
+            threading.Thread(target=self._broadcast_loop, args=(broadcast_to, interval), daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for device in self.devices:
+            device.stop()
+
+    def _broadcast_loop(self, target: str, interval: float) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        packets = [device.announcement() for device in self.devices]
+        while not self._stop.is_set():
+            for packet in packets:
+                try:
+                    sock.sendto(packet, (target, tinytuya.UDPPORTS))
+                except OSError:
+                    pass
+            self._stop.wait(interval)
+
+    def scan_result(self) -> dict:
+        """Resultado no formato do tinytuya.deviceScan() ({ip: {...}})."""
+        return {
+            d.ip: {"ip": d.ip, "gwId": d.dev_id, "version": str(d.version), "active": 2}
+            for d in self.devices
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=10, help="quantidade de devices simulados (máx. 240)")
+    parser.add_argument("--versions", default="3.3,3.4", help="versões do protocolo, distribuídas em rodízio")
+    parser.add_argument("--latency", type=float, default=0.0, help="tempo (s) que cada device leva para aplicar um comando")
+    parser.add_argument("--broadcast-to", default=None, help="destino dos anúncios UDP (ex: 127.0.0.1 ou 255.255.255.255)")
+    parser.add_argument("--interval", type=float, default=5.0, help="intervalo (s) entre anúncios UDP")
+    args = parser.parse_args()
+
+    if not 0 < args.devices <= 240:
+        parser.error("--devices deve estar entre 1 e 240")
+
+    versions = tuple(float(v) for v in args.versions.split(","))
+    network = SimulatedNetwork(args.devices, versions, args.latency)
+    network.start(args.broadcast_to, args.interval)
+    # Primeira linha: lista de devices em JSON (lida pelos benchmarks)
+    print("DEVICES " + json.dumps([d.info() for d in network.devices]), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        network.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())